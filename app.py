@@ -1,37 +1,67 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import pandas as pd
+from pathlib import Path
 from PIL import Image
 import plotly.express as px
 
 
+# -------------------- Data Loading Section --------------------
+@st.cache_data
+def load_csv(path: str) -> pd.DataFrame:
+    """
+    Read the transaction CSV with the multithreaded PyArrow reader. Date and time are kept
+    as strings (PyArrow would otherwise parse the time column itself). Cached so that
+    Streamlit reruns do not re-read the file.
+    """
+    return pd.read_csv(path, engine='pyarrow', dtype={'Transaction_Date': str, 'Transaction_Time': str})
+
+
+@st.cache_resource
+def read_html(path: str) -> str:
+    """
+    Read a pre-generated interactive graph HTML file. The file is read as raw bytes and
+    decoded once; the resulting string is immutable, so it is cached as a shared resource
+    and handed out on every rerun without the copy that st.cache_data makes.
+    """
+    return Path(path).read_bytes().decode('utf-8')
+
+
 # -------------------- Data Cleaning Section --------------------
+@st.cache_data(persist="disk")
 def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     """
     Clean the CSV data by:
       - Dropping unnecessary columns.
       - Converting Transaction_Date and Transaction_Time into separate numerical components.
+    Results are cached (also on disk) keyed on the input data, so reruns skip the cleaning.
     """
     # Remove columns not needed for analysis or to preserve privacy
     df.drop(columns=['Customer_ID', 'Merchant_ID', 'Transaction_ID',
                      'Customer_Email', 'Customer_Contact', 'Transaction_Description'],
             inplace=True, axis=1)
 
+    # Parse each date/time column once and derive the components from the parsed values
+    dt_date = pd.to_datetime(df['Transaction_Date'], format='%d-%m-%Y', cache=True)
+    dt_time = pd.to_datetime(df['Transaction_Time'], format='%H:%M:%S', cache=True)
+
     # Extract year, month, and day from Transaction_Date
-    df['year'] = pd.to_datetime(df['Transaction_Date'], dayfirst=True).dt.year
-    df['month'] = pd.to_datetime(df['Transaction_Date'], dayfirst=True).dt.month
-    df['day'] = pd.to_datetime(df['Transaction_Date'], dayfirst=True).dt.day
+    df['year'] = dt_date.dt.year
+    df['month'] = dt_date.dt.month
+    df['day'] = dt_date.dt.day
 
     # Extract hour, minute, and second from Transaction_Time
-    df['hour'] = pd.to_datetime(df['Transaction_Time'], format='%H:%M:%S').dt.hour
-    df['minute'] = pd.to_datetime(df['Transaction_Time'], format='%H:%M:%S').dt.minute
-    df['second'] = pd.to_datetime(df['Transaction_Time'], format='%H:%M:%S').dt.second
+    df['hour'] = dt_time.dt.hour
+    df['minute'] = dt_time.dt.minute
+    df['second'] = dt_time.dt.second
 
     # Drop original date/time columns and other unneeded columns
     df.drop(columns=['Transaction_Date', 'Transaction_Time', 'Transaction_Currency', 'Customer_Name'], inplace=True,
             axis=1)
 
-    return df
+    # Consolidate the columns added above into one contiguous block per dtype, so that
+    # column-wise operations downstream work on contiguous memory
+    return df.copy()
 
 
 # -------------------- Graph Snapshot Visualization Section --------------------
@@ -55,7 +85,7 @@ def main():
 
     # ----- Data Cleaning Section -----
     st.header("1. Data Cleaning")
-    df_original = pd.read_csv("assets/Bank_Transaction_Fraud_Detection.csv")
+    df_original = load_csv("assets/Bank_Transaction_Fraud_Detection.csv")
     st.subheader("Original Data (First 5 Rows)")
     st.dataframe(df_original.head())
 
@@ -87,8 +117,7 @@ def main():
     st.subheader("3.1 Interactive Original Graph")
     original_html = "./assets/original_graph.html"  # Ensure this file exists in the same directory
     try:
-        with open(original_html, 'r', encoding='utf-8') as f:
-            html_data = f.read()
+        html_data = read_html(original_html)
         components.html(html_data, height=600, scrolling=True)
     except Exception as e:
         st.error(f"Error reading {original_html}: {e}")
@@ -96,8 +125,7 @@ def main():
     st.subheader("3.2 Interactive FMEA Transaction Graph")
     transaction_html = "./assets/transaction_graph.html"  # Ensure this file exists in the same directory
     try:
-        with open(transaction_html, 'r', encoding='utf-8') as f:
-            html_data = f.read()
+        html_data = read_html(transaction_html)
         components.html(html_data, height=600, scrolling=True)
     except Exception as e:
         st.error(f"Error reading {transaction_html}: {e}")
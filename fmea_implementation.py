@@ -1,3 +1,6 @@
+import argparse
+
+import numpy as np
 from neo4j import GraphDatabase
 
 def run_fmea(driver, threshold=30):
@@ -8,53 +11,126 @@ def run_fmea(driver, threshold=30):
       - Detection: A constant (5).
     Then compute RPN (severity * occurrence * detection) and flag as "High Risk" if RPN >= threshold.
     """
-    # Compute global statistics for Transaction_Amount
-    stats_query = """
-    MATCH (t:Transaction)
-    RETURN avg(t.Transaction_Amount) as avg_amt, stDev(t.Transaction_Amount) as std_amt
+    # FMEA query: global statistics for Transaction_Amount are computed in a first subquery,
+    # then a second subquery updates each Transaction node with FMEA factors and failure_mode.
+    # The statistics and the collected per-node results come back in a single row.
+    fmea_query = """
+    CALL {
+      MATCH (t:Transaction)
+      RETURN avg(t.Transaction_Amount) as avg_amt, stDev(t.Transaction_Amount) as std_amt
+    }
+    CALL {
+      WITH avg_amt, std_amt
+      MATCH (t:Transaction)
+      OPTIONAL MATCH (t)-[r:SIMILAR]->()
+      WITH t, count(r) as sim_count, avg_amt, std_amt
+      WITH t, sim_count,
+           CASE 
+             WHEN t.Transaction_Amount > avg_amt + 2 * std_amt THEN 10
+             WHEN t.Transaction_Amount > avg_amt + std_amt THEN 7
+             ELSE 3
+           END as severity
+      WITH t, sim_count, severity,
+           CASE WHEN sim_count + 1 > 10 THEN 10 ELSE sim_count + 1 END as occurrence,
+           5 as detection,
+           severity * (CASE WHEN sim_count + 1 > 10 THEN 10 ELSE sim_count + 1 END) * 5 as RPN
+      SET t.severity = severity,
+          t.occurrence = CASE WHEN sim_count + 1 > 10 THEN 10 ELSE sim_count + 1 END,
+          t.detection = 5,
+          t.RPN = RPN,
+          t.failure_mode = CASE WHEN RPN >= $threshold THEN "High Risk" ELSE "Normal" END
+      RETURN collect([t.Transaction_ID, t.RPN, t.failure_mode]) as results
+    }
+    RETURN avg_amt, std_amt, results
     """
     with driver.session() as session:
-        result = session.run(stats_query)
-        record = result.single()
-        avg_amt = record["avg_amt"]
-        std_amt = record["std_amt"]
+        record = session.run(fmea_query, threshold=threshold).single()
 
-    print("Global stats: Average Amount =", avg_amt, ", Std Dev =", std_amt)
+    print("Global stats: Average Amount =", record["avg_amt"], ", Std Dev =", record["std_amt"])
+    print("FMEA analysis results:")
+    for transaction_id, rpn, failure_mode in record["results"]:
+        print(f"Transaction {transaction_id}: RPN = {rpn}, Mode = {failure_mode}")
 
-    # FMEA query to compute and update each Transaction node with FMEA factors and failure_mode
-    fmea_query = """
+def compute_fmea_factors(amounts, sim_counts, avg_amt, std_amt, threshold=30):
+    """
+    Vectorized NumPy version of the FMEA factor computation done in run_fmea's Cypher query.
+    Takes arrays of transaction amounts and SIMILAR relationship counts and returns
+    (severity, occurrence, detection, RPN, failure_mode) arrays.
+    """
+    severity = np.where(amounts > avg_amt + 2 * std_amt, 10, np.where(amounts > avg_amt + std_amt, 7, 3))
+    occurrence = np.minimum(sim_counts + 1, 10)
+    detection = np.full(len(amounts), 5)
+    rpn = severity * occurrence * detection
+    failure_mode = np.where(rpn >= threshold, "High Risk", "Normal")
+    return severity, occurrence, detection, rpn, failure_mode
+
+def run_fmea_local(driver, threshold=30, batch_size=5000):
+    """
+    Alternative to run_fmea that computes the FMEA factors in Python instead of Cypher:
+    [Transaction_ID, amount, SIMILAR count] rows are fetched in one query, the factors are
+    computed with compute_fmea_factors, and the results are written back in batched
+    UNWIND ... SET queries. Null amounts are ignored by the statistics and get severity 3,
+    as in the Cypher query.
+    """
+    fetch_query = """
     MATCH (t:Transaction)
     OPTIONAL MATCH (t)-[r:SIMILAR]->()
-    WITH t, count(r) as sim_count, $avg_amt as avg_amt, $std_amt as std_amt
-    WITH t, sim_count, avg_amt, std_amt,
-         CASE 
-           WHEN t.Transaction_Amount > avg_amt + 2 * std_amt THEN 10
-           WHEN t.Transaction_Amount > avg_amt + std_amt THEN 7
-           ELSE 3
-         END as severity
-    WITH t, sim_count, severity,
-         CASE WHEN sim_count + 1 > 10 THEN 10 ELSE sim_count + 1 END as occurrence,
-         5 as detection,
-         severity * (CASE WHEN sim_count + 1 > 10 THEN 10 ELSE sim_count + 1 END) * 5 as RPN
-    SET t.severity = severity,
-        t.occurrence = CASE WHEN sim_count + 1 > 10 THEN 10 ELSE sim_count + 1 END,
-        t.detection = 5,
-        t.RPN = RPN,
-        t.failure_mode = CASE WHEN RPN >= $threshold THEN "High Risk" ELSE "Normal" END
-    RETURN t.Transaction_ID as Transaction_ID, t.RPN as RPN, t.failure_mode as failure_mode
+    WITH t, count(r) as sim_count
+    RETURN collect([t.Transaction_ID, t.Transaction_Amount, sim_count]) as rows
+    """
+    update_query = """
+    UNWIND $rows as row
+    MATCH (t:Transaction {Transaction_ID: row.Transaction_ID})
+    SET t.severity = row.severity,
+        t.occurrence = row.occurrence,
+        t.detection = row.detection,
+        t.RPN = row.RPN,
+        t.failure_mode = row.failure_mode
     """
     with driver.session() as session:
-        result = session.run(fmea_query, avg_amt=avg_amt, std_amt=std_amt, threshold=threshold)
-        print("FMEA analysis results:")
-        for record in result:
-            print(f"Transaction {record['Transaction_ID']}: RPN = {record['RPN']}, Mode = {record['failure_mode']}")
+        record = session.run(fetch_query).single()
+    # Each row is kept whole (collect() only drops null rows, never null fields), so the
+    # columns below stay aligned; a null amount becomes NaN
+    rows = np.array(record["rows"], dtype=object).reshape(-1, 3)
+    ids = rows[:, 0].tolist()
+    amounts = rows[:, 1].astype(np.float64)
+    sim_counts = rows[:, 2].astype(np.int64)
+
+    # Same statistics as Cypher's avg() and stDev() (sample standard deviation), ignoring nulls
+    known_amounts = amounts[~np.isnan(amounts)]
+    avg_amt = known_amounts.mean() if len(known_amounts) else None
+    std_amt = known_amounts.std(ddof=1) if len(known_amounts) > 1 else 0.0
+    print("Global stats: Average Amount =", avg_amt, ", Std Dev =", std_amt)
+
+    severity, occurrence, detection, rpn, failure_mode = compute_fmea_factors(
+        amounts, sim_counts, np.nan if avg_amt is None else avg_amt, std_amt, threshold)
+    rows = [
+        {"Transaction_ID": tid, "severity": sev, "occurrence": occ, "detection": det, "RPN": r, "failure_mode": mode}
+        for tid, sev, occ, det, r, mode in zip(ids, severity.tolist(), occurrence.tolist(), detection.tolist(),
+                                                rpn.tolist(), failure_mode.tolist())
+    ]
+    with driver.session() as session:
+        for start in range(0, len(rows), batch_size):
+            session.run(update_query, rows=rows[start:start + batch_size]).consume()
+
+    print("FMEA analysis results:")
+    for row in rows:
+        print(f"Transaction {row['Transaction_ID']}: RPN = {row['RPN']}, Mode = {row['failure_mode']}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Run FMEA on the Transaction graph in Neo4j.")
+    parser.add_argument("--local", action="store_true",
+                        help="compute the FMEA factors in Python (NumPy) instead of in Cypher")
+    args = parser.parse_args()
+
     uri = "bolt://localhost:7687"
     user = "neo4j"
     password = "password"  # Update with your Neo4j password
     driver = GraphDatabase.driver(uri, auth=(user, password))
-    run_fmea(driver, threshold=30)  # Adjust threshold as needed
+    if args.local:
+        run_fmea_local(driver, threshold=30)  # Adjust threshold as needed
+    else:
+        run_fmea(driver, threshold=30)  # Adjust threshold as needed
     driver.close()
 
 if __name__ == "__main__":
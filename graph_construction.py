@@ -3,47 +3,84 @@ import numpy as np
 from neo4j import GraphDatabase
 from datetime import datetime
 
+# Columns kept for analysis; IDs, names and contact details are never read, for speed and privacy
+CSV_COLUMNS = ['Gender', 'Age', 'State', 'City', 'Bank_Branch', 'Account_Type', 'Transaction_Date',
+               'Transaction_Time', 'Transaction_Amount', 'Transaction_Type', 'Merchant_Category',
+               'Account_Balance', 'Transaction_Device', 'Transaction_Location', 'Device_Type', 'Is_Fraud']
+CSV_DTYPES = {'Age': 'int16', 'Is_Fraud': 'int8', 'Transaction_Amount': 'float64', 'Account_Balance': 'float64',
+              'Transaction_Date': str, 'Transaction_Time': str}
+
+# Columns referenced by the Transaction node CREATE query; only these are sent to Neo4j
+NODE_COLUMNS = ['Transaction_ID', 'Gender', 'Age', 'State', 'City', 'Bank_Branch', 'Account_Type',
+                'Transaction_Amount', 'Transaction_Type', 'Merchant_Category', 'Account_Balance',
+                'Transaction_Device', 'Transaction_Location', 'Device_Type', 'Is_Fraud', 'timestamp_str',
+                'timestamp_epoch']
+
 def load_data(csv_path: str) -> pd.DataFrame:
     """
     Load the CSV file, perform data cleaning and transformation:
-      - Drop unnecessary columns.
+      - Read only the needed columns (multithreaded PyArrow CSV reader).
       - Convert Transaction_Date and Transaction_Time into numeric components.
-      - Create a unified timestamp column and generate a unique Transaction_ID.
+      - Create a unified timestamp column, sort by it and generate a unique Transaction_ID.
     """
-    df = pd.read_csv(csv_path)
+    df = pd.read_csv(csv_path, engine='pyarrow', usecols=CSV_COLUMNS, dtype=CSV_DTYPES)
 
-    # Drop columns not needed for analysis or privacy reasons
-    df.drop(columns=['Customer_ID', 'Merchant_ID', 'Transaction_ID', 'Customer_Email', 'Customer_Contact',
-                     'Transaction_Description'], inplace=True, axis=1)
+    # For testing, we'll use only the first 1000 rows
+    df = df.iloc[:1000].copy()
+
+    # Parse each date/time column once and derive the components from the parsed values
+    dt_date = pd.to_datetime(df['Transaction_Date'], format='%d-%m-%Y', cache=True)
+    dt_time = pd.to_datetime(df['Transaction_Time'], format='%H:%M:%S', cache=True)
 
     # Convert Transaction_Date to separate year, month, day columns
-    df['year'] = pd.to_datetime(df['Transaction_Date'], dayfirst=True).dt.year
-    df['month'] = pd.to_datetime(df['Transaction_Date'], dayfirst=True).dt.month
-    df['day'] = pd.to_datetime(df['Transaction_Date'], dayfirst=True).dt.day
+    df['year'] = dt_date.dt.year
+    df['month'] = dt_date.dt.month
+    df['day'] = dt_date.dt.day
 
     # Convert Transaction_Time to hour, minute, second columns
-    df['hour'] = pd.to_datetime(df['Transaction_Time'], format='%H:%M:%S').dt.hour
-    df['minute'] = pd.to_datetime(df['Transaction_Time'], format='%H:%M:%S').dt.minute
-    df['second'] = pd.to_datetime(df['Transaction_Time'], format='%H:%M:%S').dt.second
+    df['hour'] = dt_time.dt.hour
+    df['minute'] = dt_time.dt.minute
+    df['second'] = dt_time.dt.second
 
-    # Drop original date/time and other unneeded columns
+    # Drop original date/time columns
     df.drop(columns=['Transaction_Date', 'Transaction_Time'], inplace=True)
-    df.drop(columns=['Transaction_Currency'], inplace=True, axis=1)
-    df.drop(columns=['Customer_Name'], inplace=True, axis=1)
 
-    # Create a unified timestamp column from the numeric date/time columns
-    df['timestamp'] = pd.to_datetime(df[['year', 'month', 'day', 'hour', 'minute', 'second']])
-    df['timestamp_str'] = df['timestamp'].apply(lambda x: x.isoformat())
+    # Create a unified timestamp column: the date plus the time-of-day offset
+    df['timestamp'] = dt_date.dt.normalize() + (dt_time - dt_time.dt.normalize())
+    df['timestamp_str'] = df['timestamp'].dt.strftime('%Y-%m-%dT%H:%M:%S')
 
-    # Generate a unique Transaction_ID using the row index
-    df['Transaction_ID'] = df.index.astype(str)
+    # Integer epoch seconds, so relationship pairs are found with integer arithmetic
+    df['timestamp_epoch'] = df['timestamp'].astype('int64') // 10**9
 
-    # For testing, we'll use only the first 1000 rows
-    return df[:1000]
+    # Sort by time so that temporally adjacent transactions are inserted together
+    df = df.sort_values('timestamp_epoch', kind='stable').reset_index(drop=True)
 
-def create_transaction_nodes(driver, df: pd.DataFrame):
+    # Generate a unique Transaction_ID using the row index (monotonic in time after sorting)
+    df['Transaction_ID'] = df.index.astype(np.int64)
+
+    return df
+
+def create_indexes(driver):
+    """
+    Create the Transaction_ID uniqueness constraint (backed by an index). Run before any
+    nodes are inserted, so that relationship endpoints and FMEA write-backs are looked up
+    by index instead of label scans.
+    """
+    query = """
+    CREATE CONSTRAINT transaction_id_unique IF NOT EXISTS
+    FOR (t:Transaction) REQUIRE t.Transaction_ID IS UNIQUE
+    """
+    with driver.session() as session:
+        session.run(query).consume()
+        session.run("CALL db.awaitIndexes()").consume()
+    print("Indexes created.")
+
+def create_transaction_nodes(driver, df: pd.DataFrame, batch_size: int = 5000):
     """
     Create Transaction nodes in Neo4j using the cleaned CSV data.
+    Rows are sent in batches of `batch_size`, each committed in its own transaction,
+    so only one batch is materialized as Python dicts at a time. Only the columns used by
+    the query (NODE_COLUMNS) are converted and sent.
     """
     query = """
     UNWIND $data as row
@@ -63,48 +100,80 @@ def create_transaction_nodes(driver, df: pd.DataFrame):
       Transaction_Location: row.Transaction_Location,
       Device_Type: row.Device_Type,
       Is_Fraud: row.Is_Fraud,
-      timestamp: row.timestamp_str
+      timestamp: row.timestamp_str,
+      timestamp_epoch: row.timestamp_epoch
     })
     """
-    data = df.to_dict('records')
+    node_df = df[NODE_COLUMNS]
     with driver.session() as session:
-        session.run(query, data=data)
+        for start in range(0, len(node_df), batch_size):
+            data = node_df.iloc[start:start + batch_size].to_dict('records')
+            with session.begin_transaction() as tx:
+                tx.run(query, data=data)
+                tx.commit()
     print("Transaction nodes created.")
 
-def create_next_relationships(driver):
+def compute_relationships(df: pd.DataFrame):
     """
-    Create NEXT relationships between transactions ordered by timestamp.
-    """
-    query = """
-    MATCH (t:Transaction)
-    WITH t ORDER BY t.timestamp
-    WITH collect(t) as txs
-    UNWIND range(0, size(txs)-2) as idx
-    WITH txs[idx] as t1, txs[idx+1] as t2
-    CREATE (t1)-[:NEXT {time_diff: duration.inSeconds(datetime(t1.timestamp), datetime(t2.timestamp)).seconds}]->(t2)
+    Compute NEXT and SIMILAR relationship pairs in Python from the loaded data:
+      - NEXT links each transaction to the next one in timestamp order, with the time difference.
+      - SIMILAR links t1 -> t2 when both have the same Transaction_Type, occur within one
+        hour of each other and |amount1 - amount2| < 10% of amount1.
+    SIMILAR candidates are found with a sliding one-hour window over each transaction type
+    sorted by time, so only transactions inside the window are ever compared.
+    Returns (next_pairs, similar_pairs) as lists of [source_id, target_id, time_diff] and
+    [source_id, target_id].
     """
-    with driver.session() as session:
-        session.run(query)
-    print("NEXT relationships created.")
+    df = df.sort_values('timestamp_epoch', kind='stable')
+    ids = df['Transaction_ID'].to_numpy()
+    epochs = df['timestamp_epoch'].to_numpy()
+
+    next_pairs = np.column_stack([ids[:-1], ids[1:], np.diff(epochs)]).tolist()
+
+    similar_pairs = []
+    for _, group in df.groupby('Transaction_Type', sort=False):
+        g_ids = group['Transaction_ID'].to_numpy()
+        g_epochs = group['timestamp_epoch'].to_numpy()
+        g_amounts = group['Transaction_Amount'].to_numpy()
+        # Transactions i < j < window_end[i] lie less than an hour after transaction i
+        window_end = np.searchsorted(g_epochs, g_epochs + 3600, side='left')
+        positions = np.arange(len(group))
+        max_offset = int((window_end - positions).max(initial=0))
+        for offset in range(1, max_offset):
+            i = positions[positions + offset < window_end]
+            j = i + offset
+            diff = np.abs(g_amounts[i] - g_amounts[j])
+            forward = diff < 0.1 * g_amounts[i]
+            backward = diff < 0.1 * g_amounts[j]
+            similar_pairs.extend(np.column_stack([g_ids[i[forward]], g_ids[j[forward]]]).tolist())
+            similar_pairs.extend(np.column_stack([g_ids[j[backward]], g_ids[i[backward]]]).tolist())
+
+    return next_pairs, similar_pairs
 
-def create_similar_relationships(driver):
+def create_relationships(driver, df: pd.DataFrame, batch_size: int = 5000):
     """
-    Create SIMILAR relationships between transactions that share:
-      - The same Transaction_Type,
-      - Similar Transaction_Amount (within 10%),
-      - And occur within one hour of each other.
+    Create NEXT and SIMILAR relationships from pairs computed in Python by
+    compute_relationships, avoiding any self-join in Neo4j. Each batch of NEXT and
+    SIMILAR pairs is written by one query in one transaction; endpoints are looked up
+    through the Transaction_ID uniqueness constraint.
     """
     query = """
-    MATCH (t1:Transaction), (t2:Transaction)
-    WHERE t1.Transaction_ID <> t2.Transaction_ID
-      AND t1.Transaction_Type = t2.Transaction_Type
-      AND abs(t1.Transaction_Amount - t2.Transaction_Amount) < 0.1 * t1.Transaction_Amount
-      AND abs(duration.inSeconds(datetime(t1.timestamp), datetime(t2.timestamp)).seconds) < 3600
+    UNWIND $next_pairs as p
+    MATCH (t1:Transaction {Transaction_ID: p[0]}), (t2:Transaction {Transaction_ID: p[1]})
+    CREATE (t1)-[:NEXT {time_diff: p[2]}]->(t2)
+    WITH count(*) as next_created
+    UNWIND $similar_pairs as p
+    MATCH (t1:Transaction {Transaction_ID: p[0]}), (t2:Transaction {Transaction_ID: p[1]})
     CREATE (t1)-[:SIMILAR]->(t2)
     """
+    next_pairs, similar_pairs = compute_relationships(df)
     with driver.session() as session:
-        session.run(query)
-    print("SIMILAR relationships created.")
+        for start in range(0, max(len(next_pairs), len(similar_pairs)), batch_size):
+            with session.begin_transaction() as tx:
+                tx.run(query, next_pairs=next_pairs[start:start + batch_size],
+                       similar_pairs=similar_pairs[start:start + batch_size])
+                tx.commit()
+    print(f"NEXT ({len(next_pairs)}) and SIMILAR ({len(similar_pairs)}) relationships created.")
 
 def main():
     CSV_PATH = "assets/Bank_Transaction_Fraud_Detection.csv"  # Update with your CSV file path
@@ -115,9 +184,9 @@ def main():
     driver = GraphDatabase.driver(uri, auth=(user, password))
     df = load_data(CSV_PATH)
     print("Data loaded. Number of transactions:", len(df))
+    create_indexes(driver)
     create_transaction_nodes(driver, df)
-    create_next_relationships(driver)
-    create_similar_relationships(driver)
+    create_relationships(driver, df)
     driver.close()
 
 if __name__ == "__main__":
@@ -1,60 +1,66 @@
 import networkx as nx
+import numpy as np
 import plotly.graph_objects as go
 from neo4j import GraphDatabase
 import webbrowser
 
 
+def edge_coordinates(xs, ys, src_idx, tgt_idx):
+    """
+    Build Plotly line coordinates for edges given node coordinate arrays and the
+    node indices of each edge's endpoints. Each edge becomes an (x0, x1, NaN) triple;
+    NaN separates the line segments.
+    """
+    edge_x = np.empty(3 * len(src_idx))
+    edge_y = np.empty(3 * len(src_idx))
+    edge_x[0::3] = xs[src_idx]
+    edge_x[1::3] = xs[tgt_idx]
+    edge_x[2::3] = np.nan
+    edge_y[0::3] = ys[src_idx]
+    edge_y[1::3] = ys[tgt_idx]
+    edge_y[2::3] = np.nan
+    return edge_x, edge_y
+
+
 def visualize_graph(driver):
     """
     Query transactions and relationships from Neo4j, build a NetworkX graph,
     and generate a Plotly figure. High Risk transactions are shown in red; others in blue.
     """
     query = """
-    MATCH (t:Transaction)
-    OPTIONAL MATCH (t)-[r]->(t2:Transaction)
-    RETURN t.Transaction_ID as source, t.RPN as source_rpn, t.failure_mode as source_mode, 
-           t2.Transaction_ID as target, t2.RPN as target_rpn, t2.failure_mode as target_mode, 
-           type(r) as rel_type
+    CALL {
+      MATCH (t:Transaction)
+      RETURN collect([t.Transaction_ID, t.RPN, t.failure_mode]) as nodes
+    }
+    CALL {
+      MATCH (t:Transaction)-[r]->(t2:Transaction)
+      RETURN collect([t.Transaction_ID, t2.Transaction_ID, type(r)]) as edges
+    }
+    RETURN nodes, edges
     """
-    nodes = {}
-    edges = []
-
+    # Nodes and edges come back as two lists in a single record
     with driver.session() as session:
-        results = session.run(query)
-        for record in results:
-            src = record["source"]
-            if src not in nodes:
-                nodes[src] = {
-                    "RPN": record["source_rpn"],
-                    "failure_mode": record["source_mode"]
-                }
-            tgt = record["target"]
-            if tgt is not None:
-                if tgt not in nodes:
-                    nodes[tgt] = {
-                        "RPN": record["target_rpn"],
-                        "failure_mode": record["target_mode"]
-                    }
-                edges.append((src, tgt, record["rel_type"]))
+        record = session.run(query).single()
 
     # Build a directed graph using NetworkX
     G = nx.DiGraph()
-    for node, attr in nodes.items():
-        G.add_node(node, RPN=attr["RPN"], failure_mode=attr["failure_mode"])
-    for edge in edges:
-        G.add_edge(edge[0], edge[1], label=edge[2])
+    G.add_nodes_from((node, {"RPN": rpn, "failure_mode": mode}) for node, rpn, mode in record["nodes"])
+    G.add_edges_from((src, tgt, {"label": rel_type}) for src, tgt, rel_type in record["edges"])
 
     # Use a spring layout for positioning
     pos = nx.spring_layout(G, seed=42)
 
+    # Node coordinates as arrays, indexed by each node's position in G.nodes()
+    node_list = list(G.nodes())
+    pos_arr = np.array([pos[node] for node in node_list]).reshape(-1, 2)
+    xs, ys = pos_arr[:, 0], pos_arr[:, 1]
+    node_to_idx = {node: i for i, node in enumerate(node_list)}
+
     # Build edge traces for Plotly
-    edge_x = []
-    edge_y = []
-    for edge in G.edges():
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        edge_x.extend([x0, x1, None])
-        edge_y.extend([y0, y1, None])
+    n_edges = G.number_of_edges()
+    src_idx = np.fromiter((node_to_idx[u] for u, _ in G.edges()), dtype=np.int64, count=n_edges)
+    tgt_idx = np.fromiter((node_to_idx[v] for _, v in G.edges()), dtype=np.int64, count=n_edges)
+    edge_x, edge_y = edge_coordinates(xs, ys, src_idx, tgt_idx)
 
     edge_trace = go.Scatter(
         x=edge_x, y=edge_y,
@@ -64,14 +70,11 @@ def visualize_graph(driver):
     )
 
     # Build node traces with color coding based on failure_mode
-    node_x = []
-    node_y = []
+    node_x = xs
+    node_y = ys
     node_color = []
     node_text = []
     for node, attr in G.nodes(data=True):
-        x, y = pos[node]
-        node_x.append(x)
-        node_y.append(y)
         node_color.append("red" if attr["failure_mode"] == "High Risk" else "blue")
         node_text.append(f"ID: {node}<br>RPN: {attr['RPN']}<br>Mode: {attr['failure_mode']}")
 
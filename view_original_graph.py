@@ -1,9 +1,27 @@
 import networkx as nx
+import numpy as np
 import plotly.graph_objects as go
 from neo4j import GraphDatabase
 import webbrowser
 
 
+def edge_coordinates(xs, ys, src_idx, tgt_idx):
+    """
+    Build Plotly line coordinates for edges given node coordinate arrays and the
+    node indices of each edge's endpoints. Each edge becomes an (x0, x1, NaN) triple;
+    NaN separates the line segments.
+    """
+    edge_x = np.empty(3 * len(src_idx))
+    edge_y = np.empty(3 * len(src_idx))
+    edge_x[0::3] = xs[src_idx]
+    edge_x[1::3] = xs[tgt_idx]
+    edge_x[2::3] = np.nan
+    edge_y[0::3] = ys[src_idx]
+    edge_y[1::3] = ys[tgt_idx]
+    edge_y[2::3] = np.nan
+    return edge_x, edge_y
+
+
 def visualize_transactions(driver):
     """
     Query Transaction nodes and only the NEXT and SIMILAR relationships from Neo4j.
@@ -14,75 +32,35 @@ def visualize_transactions(driver):
     query = """
     MATCH (t:Transaction)-[r]->(t2:Transaction)
     WHERE type(r) IN ['NEXT', 'SIMILAR']
-    RETURN t.Transaction_ID as source, 
-           type(r) as rel_type, 
-           t2.Transaction_ID as target
+    RETURN collect([t.Transaction_ID, t2.Transaction_ID, type(r)]) as edges
     """
-    nodes = {}
-    edges = []
-
+    # All edges come back as a single list of [source, target, rel_type] rows
     with driver.session() as session:
-        results = session.run(query)
-        for record in results:
-            src = record["source"]
-            tgt = record["target"]
-            rel_type = record["rel_type"]
+        edges = session.run(query).single()["edges"]
 
-            # Add source and target nodes (if not already added)
-            if src not in nodes:
-                nodes[src] = {}
-            if tgt not in nodes:
-                nodes[tgt] = {}
-
-            edges.append((src, tgt, rel_type))
-
-    # Build the directed graph using NetworkX
+    # Build the directed graph using NetworkX (nodes are added with their edges)
     G = nx.DiGraph()
-    for node in nodes:
-        G.add_node(node)
-    for edge in edges:
-        G.add_edge(edge[0], edge[1], rel_type=edge[2])
+    G.add_edges_from((src, tgt, {"rel_type": rel_type}) for src, tgt, rel_type in edges)
 
     # Position nodes using a spring layout
     pos = nx.spring_layout(G, seed=42)
 
-    # Build edge traces: color-code by relationship type
-    edge_x = []
-    edge_y = []
-    edge_colors = []
-    for edge in G.edges(data=True):
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        edge_x.extend([x0, x1, None])
-        edge_y.extend([y0, y1, None])
-
-        # Choose color based on relationship type
-        if edge[2]['rel_type'] == "NEXT":
-            edge_colors.append("green")
-        elif edge[2]['rel_type'] == "SIMILAR":
-            edge_colors.append("orange")
-        else:
-            edge_colors.append("gray")
-
-    # For simplicity, use one color for each edge type.
-    # We'll create two separate traces: one for NEXT edges and one for SIMILAR edges.
-    next_edge_x, next_edge_y = [], []
-    similar_edge_x, similar_edge_y = [], []
-
-    with driver.session() as session:
-        results = session.run(query)
-        for record in results:
-            src = record["source"]
-            tgt = record["target"]
-            rel_type = record["rel_type"]
-            x0, y0 = pos[src]
-            x1, y1 = pos[tgt]
-            if rel_type == "NEXT":
-                next_edge_x.extend([x0, x1, None])
-                next_edge_y.extend([y0, y1, None])
-            elif rel_type == "SIMILAR":
-                similar_edge_x.extend([x0, x1, None])
-                similar_edge_y.extend([y0, y1, None])
+    # Node coordinates as arrays, indexed by each node's position in G.nodes()
+    node_list = list(G.nodes())
+    pos_arr = np.array([pos[node] for node in node_list]).reshape(-1, 2)
+    xs, ys = pos_arr[:, 0], pos_arr[:, 1]
+    node_to_idx = {node: i for i, node in enumerate(node_list)}
+
+    # Build edge traces from the fetched edges: one trace for NEXT edges and one for SIMILAR edges.
+    # The edge list is used rather than G.edges() so that a NEXT and a SIMILAR edge between
+    # the same pair of transactions are both drawn.
+    src_idx = np.fromiter((node_to_idx[src] for src, _, _ in edges), dtype=np.int64, count=len(edges))
+    tgt_idx = np.fromiter((node_to_idx[tgt] for _, tgt, _ in edges), dtype=np.int64, count=len(edges))
+    rel_types = np.array([rel_type for _, _, rel_type in edges], dtype=object)
+    is_next = rel_types == "NEXT"
+    is_similar = rel_types == "SIMILAR"
+    next_edge_x, next_edge_y = edge_coordinates(xs, ys, src_idx[is_next], tgt_idx[is_next])
+    similar_edge_x, similar_edge_y = edge_coordinates(xs, ys, src_idx[is_similar], tgt_idx[is_similar])
 
     next_edge_trace = go.Scatter(
         x=next_edge_x, y=next_edge_y,
@@ -101,14 +79,9 @@ def visualize_transactions(driver):
     )
 
     # Build node trace (all nodes in blue)
-    node_x = []
-    node_y = []
-    node_text = []
-    for node in G.nodes():
-        x, y = pos[node]
-        node_x.append(x)
-        node_y.append(y)
-        node_text.append(f"Transaction ID: {node}")
+    node_x = xs
+    node_y = ys
+    node_text = [f"Transaction ID: {node}" for node in node_list]
 
     node_trace = go.Scatter(
         x=node_x, y=node_y,